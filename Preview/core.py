@@ -4,31 +4,207 @@ Contains the main PDF viewing logic and document management
 """
 
 import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
 import fitz  # PyMuPDF
 from PyQt5.QtWidgets import QMessageBox
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
 from PyQt5.QtGui import QPixmap, QImage
 
 
+def zoom_matrix(zoom):
+    """Build the render matrix for a zoom level"""
+    if zoom == 1.0:
+        return fitz.Identity
+    return fitz.Matrix(zoom, zoom)
+
+
+def render_page(page, matrix, colorspace=fitz.csRGB, clip=None):
+    """Rasterize a fitz page (or a clipped region of it) with the given matrix"""
+    return page.get_pixmap(matrix=matrix, colorspace=colorspace,
+                           alpha=False, clip=clip)
+
+
+def detect_page_colorspace(page, force_rgb=False):
+    """Pick grayscale rendering for a page whose low-resolution preview has no colour"""
+    if force_rgb:
+        return fitz.csRGB
+    samples = page.get_pixmap(matrix=fitz.Matrix(0.25, 0.25), alpha=False).samples
+    if samples[0::3] == samples[1::3] == samples[2::3]:
+        return fitz.csGRAY
+    return fitz.csRGB
+
+
+def render_page_batch(document, page_nums, matrix, force_rgb=False):
+    """Rasterize several 1-based pages in one pass with a shared matrix"""
+    load_page = document.load_page
+    pixes = []
+    for page_num in page_nums:
+        page = load_page(page_num - 1)
+        pixes.append(render_page(page, matrix, detect_page_colorspace(page, force_rgb)))
+    return pixes
+
+
+def pix_to_qpixmap(pix):
+    """Convert a rendered fitz.Pixmap into a QPixmap (GUI thread only)"""
+    # Wrap MuPDF's sample buffer without copying it into a Python bytes object;
+    # fromImage makes its own copy, so the buffer only needs to outlive this call
+    image_format = QImage.Format_Grayscale8 if pix.n == 1 else QImage.Format_RGB888
+    img = QImage(pix.samples_ptr, pix.width, pix.height, pix.stride, image_format)
+    return QPixmap.fromImage(img)
+
+
+class PixmapCache:
+    """Least-recently-used store of rendered pixmaps bounded by count and bytes"""
+    
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def get(self, key):
+        """Get a cached pixmap and mark it as most recently used"""
+        pixmap = self._entries.get(key)
+        if pixmap is not None:
+            self._entries.move_to_end(key)
+        return pixmap
+    
+    def put(self, key, pixmap):
+        """Store a pixmap, evicting least recently used entries"""
+        if key in self._entries:
+            self._bytes -= self._size_of(self._entries.pop(key))
+        self._entries[key] = pixmap
+        self._bytes += self._size_of(pixmap)
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 self._bytes > self.max_bytes):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= self._size_of(evicted)
+    
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._bytes = 0
+    
+    @staticmethod
+    def _size_of(pixmap):
+        return pixmap.width() * pixmap.height() * 4
+
+
+class PrefetchSignals(QObject):
+    """Signals used by prefetch jobs to hand rendered pages to the GUI thread"""
+    
+    # generation, file path, zoom level, list of (page number, fitz.Pixmap)
+    pages_rendered = pyqtSignal(int, str, float, object)
+
+
+class PrefetchJob(QRunnable):
+    """Background job that rasterizes pages ahead of navigation"""
+    
+    # Last opened (path, document) per pool thread, kept between jobs; keyed by
+    # thread id because threading.local is reset after each call on Qt threads
+    _thread_docs = {}
+    
+    def __init__(self, core, signals, page_nums):
+        super().__init__()
+        self.core = core
+        self.signals = signals
+        self.page_nums = page_nums
+        self.file_path = core.current_pdf_path
+        self.zoom = core.zoom_level
+        self.force_rgb = core.force_rgb
+        self.generation = core.prefetch_generation
+    
+    def is_stale(self):
+        """Check whether navigation has moved on since the job was queued"""
+        return self.generation != self.core.prefetch_generation
+    
+    @classmethod
+    def _thread_document(cls, file_path):
+        """Get this thread's document handle, reopening it only when the file changes"""
+        thread_id = threading.get_ident()
+        doc_path, doc = cls._thread_docs.get(thread_id, (None, None))
+        if doc_path != file_path:
+            if doc is not None:
+                doc.close()
+            cls._thread_docs.pop(thread_id, None)
+            doc = fitz.open(file_path)
+            cls._thread_docs[thread_id] = (file_path, doc)
+        return doc
+    
+    def run(self):
+        """Render pages using this thread's own document handle"""
+        if self.is_stale():
+            return
+        try:
+            document = self._thread_document(self.file_path)
+            pixes = render_page_batch(document, self.page_nums, zoom_matrix(self.zoom),
+                                      self.force_rgb)
+        except Exception:
+            self._thread_docs.pop(threading.get_ident(), None)
+            return
+        if not self.is_stale():
+            self.signals.pages_rendered.emit(
+                self.generation, self.file_path, self.zoom,
+                list(zip(self.page_nums, pixes))
+            )
+
+
 class PDFViewerCore:
     """Core PDF document handling and rendering logic"""
     
+    # Rendered page cache limits (entries and approximate bytes)
+    PIXMAP_CACHE_MAX_ENTRIES = 16
+    PIXMAP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+    
+    # Pages whose whole-page pixmap would exceed this many bytes are rendered in
+    # square tiles; ordinary pages stay whole even at maximum zoom
+    TILE_SIZE = 512
+    TILE_THRESHOLD_BYTES = 64 * 1024 * 1024
+    TILE_CACHE_MAX_ENTRIES = 256
+    TILE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+    
+    # Recently used fitz.Page objects kept alive to skip load_page on revisits
+    PAGE_CACHE_MAX_ENTRIES = 8
+    
     def __init__(self):
         self.pdf_document = None
         self.current_pdf_path = None
         self.current_page_num = 0
         self.total_pages = 0
         self.zoom_level = 1.0
+        self._matrix = fitz.Identity
         self.scroll_position = 0
         self.page_height = 0
         self.scroll_threshold = 100
+        self.travel_direction = 1  # +1 reading forward, -1 paging backward
+        self._pixmap_cache = PixmapCache(self.PIXMAP_CACHE_MAX_ENTRIES,
+                                         self.PIXMAP_CACHE_MAX_BYTES)
+        self._tile_cache = PixmapCache(self.TILE_CACHE_MAX_ENTRIES, self.TILE_CACHE_MAX_BYTES)
+        self._page_cache = OrderedDict()
+        self._text_index = None
+        self.prefetch_generation = 0
+        self.force_rgb = False
+        # Grayscale or RGB per page, decided when the page is first rendered
+        self._page_colorspaces = {}
     
     def load_pdf(self, file_path):
         """Load a PDF document from file path"""
         try:
             self.pdf_document = fitz.open(file_path)
+            self._page_cache.clear()
+            self._text_index = None
+            self.clear_pixmap_cache()
+            self.prefetch_generation += 1
             self.current_pdf_path = file_path
             self.total_pages = len(self.pdf_document)
+            self._page_colorspaces.clear()
             self.current_page_num = 1
+            self.travel_direction = 1
             self.scroll_position = 0
             return True, f"Successfully loaded: {os.path.basename(file_path)}"
         except Exception as e:
@@ -44,18 +220,123 @@ class PDFViewerCore:
             page_num = self.current_page_num
             
         if 0 <= page_num - 1 < self.total_pages:
-            page = self.pdf_document.load_page(page_num - 1)
-            pix = page.get_pixmap(matrix=fitz.Matrix(self.zoom_level, self.zoom_level))
-            img = QImage(pix.samples, pix.width, pix.height, pix.stride, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(img)
+            key = (page_num, round(self.zoom_level, 3))
+            pixmap = self._pixmap_cache.get(key)
+            if pixmap is None:
+                pix = render_page(self._load_page(page_num), self._matrix,
+                                  self.page_colorspace(page_num))
+                pixmap = pix_to_qpixmap(pix)
+                self._pixmap_cache.put(key, pixmap)
             self.page_height = pixmap.height()
             return pixmap
         return None
     
+    def _load_page(self, page_num):
+        """Get the fitz.Page for a 1-based page number, reusing recent pages"""
+        page = self._page_cache.get(page_num)
+        if page is None:
+            page = self.pdf_document.load_page(page_num - 1)
+            self._page_cache[page_num] = page
+            if len(self._page_cache) > self.PAGE_CACHE_MAX_ENTRIES:
+                self._page_cache.popitem(last=False)
+        else:
+            self._page_cache.move_to_end(page_num)
+        return page
+    
+    def get_page_size(self, page_num=None):
+        """Get the rendered pixel size of a page at the current zoom"""
+        if not self.pdf_document:
+            return 0, 0
+        if page_num is None:
+            page_num = self.current_page_num
+        page = self._load_page(page_num)
+        irect = (page.rect * self._matrix).irect
+        return irect.width, irect.height
+    
+    def needs_tiling(self, page_num=None):
+        """Check whether a page is too large to render as a single pixmap"""
+        width, height = self.get_page_size(page_num)
+        return width * height * 4 > self.TILE_THRESHOLD_BYTES
+    
+    def get_page_tile(self, page_num, tile_x, tile_y, tile_px=None):
+        """Get pixmap for one square tile of a page at the current zoom"""
+        if not self.pdf_document or not 0 <= page_num - 1 < self.total_pages:
+            return None
+        tile_px = tile_px or self.TILE_SIZE
+        key = (page_num, round(self.zoom_level, 3), tile_x, tile_y, tile_px)
+        pixmap = self._tile_cache.get(key)
+        if pixmap is None:
+            page = self._load_page(page_num)
+            page_rect = page.rect
+            span = tile_px / self.zoom_level
+            x0 = page_rect.x0 + tile_x * span
+            y0 = page_rect.y0 + tile_y * span
+            clip = fitz.Rect(x0, y0, x0 + span, y0 + span) & page_rect
+            if clip.is_empty:
+                return None
+            pix = render_page(page, self._matrix, self.page_colorspace(page_num), clip)
+            pixmap = pix_to_qpixmap(pix)
+            self._tile_cache.put(key, pixmap)
+        return pixmap
+    
+    def page_colorspace(self, page_num):
+        """Get the colorspace a page renders in, checking its colour content once"""
+        colorspace = self._page_colorspaces.get(page_num)
+        if colorspace is None:
+            colorspace = detect_page_colorspace(self._load_page(page_num), self.force_rgb)
+            self._page_colorspaces[page_num] = colorspace
+        return colorspace
+    
+    def toggle_force_rgb(self):
+        """Toggle forcing full colour rendering for photo-heavy documents"""
+        self.force_rgb = not self.force_rgb
+        self._page_colorspaces.clear()
+        self.clear_pixmap_cache()
+        self.prefetch_generation += 1
+        return True
+    
+    def is_page_cached(self, page_num):
+        """Check whether a page is already rendered at the current zoom"""
+        return (page_num, round(self.zoom_level, 3)) in self._pixmap_cache
+    
+    def get_prefetch_pages(self):
+        """Get the uncached pages ahead of the current one in the direction of travel"""
+        if not self.pdf_document or self.needs_tiling():
+            return []
+        reach = 2 if self.zoom_level <= 1.0 else 1
+        candidates = [self.current_page_num + self.travel_direction * offset
+                      for offset in range(1, reach + 1)]
+        return [n for n in candidates
+                if 1 <= n <= self.total_pages and not self.is_page_cached(n)]
+    
+    def store_prefetched_pages(self, generation, file_path, zoom, pages):
+        """Cache pages rendered by a prefetch job if they are still relevant"""
+        if generation != self.prefetch_generation or file_path != self.current_pdf_path:
+            return False
+        for page_num, pix in pages:
+            if (page_num, round(zoom, 3)) not in self._pixmap_cache:
+                self.store_rendered_page(file_path, page_num, zoom, pix)
+        return True
+    
+    def store_rendered_page(self, file_path, page_num, zoom, pix):
+        """Cache a page rendered by a prefetch job and return its pixmap"""
+        if file_path != self.current_pdf_path:
+            return None
+        pixmap = pix_to_qpixmap(pix)
+        self._pixmap_cache.put((page_num, round(zoom, 3)), pixmap)
+        return pixmap
+    
+    def clear_pixmap_cache(self):
+        """Drop all cached page renders and tiles"""
+        self._pixmap_cache.clear()
+        self._tile_cache.clear()
+    
     def go_to_page(self, page_num):
         """Navigate to a specific page"""
         if self.pdf_document and self.total_pages > 0:
             if 1 <= page_num <= self.total_pages:
+                if page_num != self.current_page_num:
+                    self.travel_direction = 1 if page_num > self.current_page_num else -1
                 self.current_page_num = page_num
                 self.scroll_position = 0
                 return True, None
@@ -82,21 +363,25 @@ class PDFViewerCore:
     def zoom_in(self, factor=0.1):
         """Zoom in by specified factor"""
         self.zoom_level = min(self.zoom_level + factor, 3.0)
+        self._matrix = zoom_matrix(self.zoom_level)
         return True
     
     def zoom_out(self, factor=0.1):
         """Zoom out by specified factor"""
         self.zoom_level = max(self.zoom_level - factor, 0.5)
+        self._matrix = zoom_matrix(self.zoom_level)
         return True
     
     def zoom_in_by_factor(self, factor):
         """Zoom in by multiplication factor"""
         self.zoom_level = min(self.zoom_level * factor, 3.0)
+        self._matrix = zoom_matrix(self.zoom_level)
         return True
     
     def zoom_out_by_factor(self, factor):
         """Zoom out by division factor"""
         self.zoom_level = max(self.zoom_level / factor, 0.5)
+        self._matrix = zoom_matrix(self.zoom_level)
         return True
     
     def reset_pdf_state(self):
@@ -105,9 +390,53 @@ class PDFViewerCore:
         self.current_pdf_path = None
         self.current_page_num = 0
         self.total_pages = 0
+        self.travel_direction = 1
         self.zoom_level = 1.0
+        self._matrix = fitz.Identity
         self.scroll_position = 0
         self.page_height = 0
+        self._page_colorspaces.clear()
+        self._page_cache.clear()
+        self._text_index = None
+        self.clear_pixmap_cache()
+        self.prefetch_generation += 1
+    
+    def build_text_index(self):
+        """Extract the lowercased text of every page once for searching"""
+        if self._text_index is None and self.pdf_document:
+            texts = []
+            offset_maps = []
+            for page in self.pdf_document:
+                raw = page.get_text()
+                text = raw.lower()
+                texts.append(text)
+                # lower() can lengthen a character (e.g. 'İ'); map such pages back to raw offsets
+                offset_maps.append(None if len(text) == len(raw) else
+                                   [i for i, char in enumerate(raw) for _ in char.lower()])
+            page_starts = []
+            offset = 0
+            for text in texts:
+                page_starts.append(offset)
+                offset += len(text) + 1
+            # One flat string lets str.find scan the whole document in C
+            self._text_index = ("\0".join(texts), page_starts, offset_maps)
+        return self._text_index
+    
+    def search(self, term):
+        """Find case-insensitive matches as (page number, offset in page text) pairs"""
+        if not term or not self.pdf_document:
+            return []
+        text, page_starts, offset_maps = self.build_text_index()
+        needle = term.lower()
+        results = []
+        pos = text.find(needle)
+        while pos != -1:
+            index = bisect_right(page_starts, pos) - 1
+            offset = pos - page_starts[index]
+            offset_map = offset_maps[index]
+            results.append((index + 1, offset if offset_map is None else offset_map[offset]))
+            pos = text.find(needle, pos + 1)
+        return results
     
     def get_document_info(self):
         """Get current document information"""
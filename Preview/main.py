@@ -5,12 +5,10 @@ Combines all modules to create the complete PDF viewer
 
 import sys
 from PyQt5.QtWidgets import QApplication, QMainWindow, QFileDialog, QMessageBox
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon
-from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
 
 # Import custom modules
-from core import PDFViewerCore
+from core import PDFViewerCore, PrefetchJob, PrefetchSignals
 from ui import PDFViewerUI, ToolbarBuilder
 from widget import PDFContentWidget
 
@@ -21,11 +19,42 @@ class PDFViewerApp(QMainWindow):
         super().__init__()
         self.setWindowTitle("Preview")
         self.setGeometry(200, 200, 2000, 1600)
-        self.setStyleSheet("QMainWindow { background-color: #0a0a0a; }")
+        PDFViewerUI.apply_global_stylesheet()
         
         # Initialize core PDF functionality
         self.pdf_core = PDFViewerCore()
         
+        # Background prefetch of neighbouring pages; one worker so jobs never overlap.
+        # MuPDF is also called from the GUI thread, each thread with its own document;
+        # PyMuPDF holds the GIL while it works, so those calls take turns
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        # Keep the worker alive so its open document handle is reused across jobs
+        self._pool.setExpiryTimeout(-1)
+        self._prefetch_signals = PrefetchSignals(self)
+        # Prefetch waits until the current page has been painted and navigation has paused,
+        # so it never competes with the visible page for the GIL
+        self._prefetch_timer = QTimer(self)
+        self._prefetch_timer.setSingleShot(True)
+        self._prefetch_timer.setInterval(150)
+        self._prefetch_timer.timeout.connect(self.prefetch_neighbors)
+        
+        # Coalesce bursts of zoom/scroll updates into a single render
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(30)
+        self._render_timer.timeout.connect(self._do_render)
+        # Set by wheel scrolling that crosses a page boundary until that page is shown
+        self._page_change_pending = False
+        
+        # Widgets created by init_ui
+        self.toolbar = None
+        self.page_input = None
+        self.total_pages_label = None
+        self.pdf_content_widget = None
+        self.pdf_content_label = None
+        self.scroll_area = None
+        
         # Initialize UI
         self.init_ui()
         
@@ -69,6 +98,8 @@ class PDFViewerApp(QMainWindow):
         # Zoom controls
         zoom_out_btn = builder.add_button("zoom_out", "−", "Zoom Out", 40)
         zoom_in_btn = builder.add_button("zoom_in", "+", "Zoom In", 40)
+        color_btn = builder.add_button("color_mode", "◐", "Force Colour Rendering", 40)
+        color_btn.setCheckable(True)
         
         # Page navigation
         self.page_input = PDFViewerUI.create_page_input()
@@ -95,13 +126,13 @@ class PDFViewerApp(QMainWindow):
         builder.add_spacing(15)
         
         # Store buttons for later use
-        self.toolbar_buttons = builder.get_all_buttons()
+        self.toolbar = builder.build()
         
         main_layout.addWidget(toolbar_container)
     
     def create_content_area(self, main_layout):
         """Create the PDF content display area"""
-        # Create custom content widget for touch events
+        # Create custom content widget for pinch gestures
         self.pdf_content_widget = PDFContentWidget(self)
         content_layout = PDFViewerUI.create_content_widget_layout()
         self.pdf_content_widget.setLayout(content_layout)
@@ -121,18 +152,23 @@ class PDFViewerApp(QMainWindow):
         # Page navigation
         self.page_input.returnPressed.connect(self.go_to_page_from_input)
         
+        # Prefetched pages arrive from the worker thread
+        self._prefetch_signals.pages_rendered.connect(
+            self.pdf_core.store_prefetched_pages, Qt.QueuedConnection
+        )
+        
         # Toolbar buttons
-        self.toolbar_buttons["zoom_in"].clicked.connect(self.zoom_in)
-        self.toolbar_buttons["zoom_out"].clicked.connect(self.zoom_out)
-        self.toolbar_buttons["prev_page"].clicked.connect(self.prev_page)
-        self.toolbar_buttons["next_page"].clicked.connect(self.next_page)
-        self.toolbar_buttons["open_pdf"].clicked.connect(self.open_pdf_file)
+        self.toolbar.zoom_in.clicked.connect(self.zoom_in)
+        self.toolbar.zoom_out.clicked.connect(self.zoom_out)
+        self.toolbar.color_mode.clicked.connect(self.toggle_color_mode)
+        self.toolbar.prev_page.clicked.connect(self.prev_page)
+        self.toolbar.next_page.clicked.connect(self.next_page)
+        self.toolbar.open_pdf.clicked.connect(self.open_pdf_file)
     
     def open_pdf_file(self):
         """Open a PDF file dialog and load the selected file"""
-        options = QFileDialog.Options()
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Open PDF File", "", "PDF Files (*.pdf);;All Files (*)", options=options
+            self, "Open PDF File", "", "PDF Files (*.pdf);;All Files (*)"
         )
         
         if file_path:
@@ -150,22 +186,60 @@ class PDFViewerApp(QMainWindow):
         if doc_info['has_document'] and doc_info['total_pages'] > 0:
             self.page_input.setText(str(doc_info['current_page']))
             self.total_pages_label.setText(f"of {doc_info['total_pages']}")
-            self.display_page()
+            self._prefetch_timer.stop()
+            self._render_timer.start()
         else:
+            self._render_timer.stop()
+            self._prefetch_timer.stop()
             self.page_input.setText("0")
             self.total_pages_label.setText("of 0")
+            self.pdf_content_widget.clear_tiled_page()
+            self.pdf_content_label.show()
             self.pdf_content_label.setText("Please open a PDF file.")
     
+    def _do_render(self):
+        """Render the page once the burst of display updates has settled"""
+        self.display_page()
+        self._page_change_pending = False
+        self._prefetch_timer.start()
+    
     def display_page(self):
         """Display the current page"""
-        pixmap = self.pdf_core.get_page_pixmap()
-        if pixmap:
+        if self.pdf_core.needs_tiling():
+            # Large pages are painted tile by tile for the visible region only
+            width, height = self.pdf_core.get_page_size()
+            self.pdf_core.page_height = height
+            self.pdf_content_label.hide()
+            self.pdf_content_widget.set_tiled_page(self.pdf_core.current_page_num, width, height)
+            self.apply_scroll_position()
+        else:
+            pixmap = self.pdf_core.get_page_pixmap()
+            if pixmap is not None:
+                self.show_page_pixmap(pixmap)
+            self.apply_scroll_position()
+    
+    def apply_scroll_position(self):
+        """Scroll the shown page to its pending target once, then back to top-of-page"""
+        if self.scroll_area is not None:
+            scrollbar = self.scroll_area.verticalScrollBar()
+            scrollbar.setValue(self.pdf_core.scroll_position)
+        self.pdf_core.scroll_position = 0
+    
+    def show_page_pixmap(self, pixmap):
+        """Show a whole-page pixmap in the content label"""
+        self.pdf_content_widget.clear_tiled_page()
+        self.pdf_content_label.show()
+        # Cached pixmaps share data, so an equal cacheKey means it is already shown
+        current = self.pdf_content_label.pixmap()
+        if current is None or current.cacheKey() != pixmap.cacheKey():
             self.pdf_content_label.setPixmap(pixmap)
-            
-            # Apply scroll position if needed
-            if hasattr(self, 'scroll_area'):
-                scrollbar = self.scroll_area.verticalScrollBar()
-                scrollbar.setValue(self.pdf_core.scroll_position)
+    
+    def prefetch_neighbors(self):
+        """Queue background rendering of the pages ahead of the current one"""
+        self.pdf_core.prefetch_generation += 1
+        page_nums = self.pdf_core.get_prefetch_pages()
+        if page_nums:
+            self._pool.start(PrefetchJob(self.pdf_core, self._prefetch_signals, page_nums))
     
     def go_to_page_from_input(self):
         """Handle page navigation from input field"""
@@ -207,6 +281,11 @@ class PDFViewerApp(QMainWindow):
         if self.pdf_core.zoom_out():
             self.update_page_display()
     
+    def toggle_color_mode(self):
+        """Toggle between automatic grayscale and forced colour rendering"""
+        if self.pdf_core.toggle_force_rgb():
+            self.update_page_display()
+    
     def zoom_in_by_factor(self, factor):
         """Zoom in by specific factor (for pinch gestures)"""
         if self.pdf_core.zoom_in_by_factor(factor):
@@ -218,9 +297,10 @@ class PDFViewerApp(QMainWindow):
             self.update_page_display()
     
     def scroll_up(self):
-        """Handle upward scrolling"""
-        if not self.pdf_core.pdf_document:
-            return
+        """Handle upward scrolling; returns True when it moved to another page"""
+        # Until the new page is shown the scrollbar still belongs to the old one
+        if not self.pdf_core.pdf_document or self._page_change_pending:
+            return False
         
         scrollbar = self.scroll_area.verticalScrollBar()
         current_scroll = scrollbar.value()
@@ -229,18 +309,22 @@ class PDFViewerApp(QMainWindow):
         if current_scroll <= 0:
             success, _ = self.pdf_core.prev_page()
             if success:
+                # Start at bottom of previous page once it is displayed
+                self.pdf_core.scroll_position = scrollbar.maximum()
+                self._page_change_pending = True
                 self.update_page_display()
-                # Start at bottom of previous page
-                scrollbar.setValue(scrollbar.maximum())
+                return True
         else:
             # Scroll up within page
             new_scroll = max(0, current_scroll - self.pdf_core.scroll_threshold)
             scrollbar.setValue(new_scroll)
+        return False
     
     def scroll_down(self):
-        """Handle downward scrolling"""
-        if not self.pdf_core.pdf_document:
-            return
+        """Handle downward scrolling; returns True when it moved to another page"""
+        # Until the new page is shown the scrollbar still belongs to the old one
+        if not self.pdf_core.pdf_document or self._page_change_pending:
+            return False
         
         scrollbar = self.scroll_area.verticalScrollBar()
         current_scroll = scrollbar.value()
@@ -250,13 +334,15 @@ class PDFViewerApp(QMainWindow):
         if current_scroll >= max_scroll:
             success, _ = self.pdf_core.next_page()
             if success:
+                # Start at top of next page once it is displayed
+                self._page_change_pending = True
                 self.update_page_display()
-                # Start at top of next page
-                scrollbar.setValue(0)
+                return True
         else:
             # Scroll down within page
             new_scroll = min(max_scroll, current_scroll + self.pdf_core.scroll_threshold)
             scrollbar.setValue(new_scroll)
+        return False
 
 
 def main():
@@ -3,22 +3,144 @@ PDF Viewer UI Module
 Contains UI components and styling for the PDF viewer
 """
 
-from PyQt5.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QPushButton, 
+from dataclasses import asdict, dataclass
+from PyQt5.QtWidgets import (QApplication, QWidget, QHBoxLayout, QVBoxLayout, QPushButton, 
                            QLineEdit, QLabel, QScrollArea)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 
+@dataclass(frozen=True)
+class Theme:
+    """Colours the application stylesheet is built from"""
+    
+    window_bg: str = "#0a0a0a"
+    toolbar_bg: str = "#3c3c3c"
+    border: str = "#4a4a4a"
+    button_bg: str = "#3c3c3c"
+    hover_bg: str = "#4a4a4a"
+    hover_border: str = "#5a5a5a"
+    pressed_bg: str = "#2a2a2a"
+    input_bg: str = "#5a5a5a"
+    input_border: str = "#6a6a6a"
+    text: str = "white"
+    content_bg: str = "#1e1e1e"
+    placeholder_text: str = "#aaaaaa"
+
+
+# All widget styling lives in one application stylesheet keyed by object name,
+# so Qt parses it once instead of once per widget
+_MAIN_WINDOW_QSS_TEMPLATE = """
+    QMainWindow {{
+        background-color: {window_bg};
+    }}
+"""
+
+_TOOLBAR_QSS_TEMPLATE = """
+    QWidget#toolbar, QWidget#toolbar * {{
+        background-color: {toolbar_bg};
+        border-bottom: 1px solid {border};
+    }}
+"""
+
+# Toolbar buttons are 40px square; QSS sizes the content box, so the
+# 8px padding and 1px border on each side come off that
+_BUTTON_QSS_TEMPLATE = """
+    QPushButton#tbBtn, QPushButton#tbBtnWide {{
+        background-color: {button_bg};
+        color: {text};
+        border: 1px solid {border};
+        border-radius: 6px;
+        padding: 8px;
+        font-size: 18px;
+        font-weight: bold;
+    }}
+    QPushButton#tbBtn, QPushButton#tbBtnWide {{
+        min-height: 22px;
+        max-height: 22px;
+    }}
+    QPushButton#tbBtn {{
+        min-width: 22px;
+        max-width: 22px;
+    }}
+    QPushButton#tbBtn:hover, QPushButton#tbBtnWide:hover {{
+        background-color: {hover_bg};
+        border: 1px solid {hover_border};
+    }}
+    QPushButton#tbBtn:pressed, QPushButton#tbBtnWide:pressed {{
+        background-color: {pressed_bg};
+    }}
+"""
+
+_PAGE_INPUT_QSS_TEMPLATE = """
+    QLineEdit#pageInput {{
+        background-color: {input_bg};
+        color: {text};
+        border: 1px solid {input_border};
+        border-radius: 5px;
+        padding: 2px;
+        font-size: 16px;
+    }}
+"""
+
+_PAGE_LABEL_QSS_TEMPLATE = """
+    QLabel#pageLabel {{
+        color: {text};
+        font-size: 16px;
+    }}
+"""
+
+_SCROLL_QSS_TEMPLATE = """
+    QScrollArea#mainScroll, QScrollArea#mainScroll * {{
+        background-color: {content_bg};
+        border: none;
+    }}
+"""
+
+_CONTENT_LABEL_QSS_TEMPLATE = """
+    QLabel#contentLabel {{
+        color: {placeholder_text};
+        font-size: 24px;
+    }}
+"""
+
+# Order matters where specificity ties: widget rules follow their container's rule
+_GLOBAL_QSS_TEMPLATE = (_MAIN_WINDOW_QSS_TEMPLATE + _TOOLBAR_QSS_TEMPLATE +
+                        _BUTTON_QSS_TEMPLATE + _PAGE_INPUT_QSS_TEMPLATE +
+                        _PAGE_LABEL_QSS_TEMPLATE + _SCROLL_QSS_TEMPLATE +
+                        _CONTENT_LABEL_QSS_TEMPLATE)
+
+THEME = Theme()
+# Formatted once at import; only rebuild_stylesheets formats it again
+GLOBAL_QSS = _GLOBAL_QSS_TEMPLATE.format(**asdict(THEME))
+
+
+def rebuild_stylesheets(theme):
+    """Switch to a new theme and re-apply the application stylesheet"""
+    global THEME, GLOBAL_QSS
+    THEME = theme
+    GLOBAL_QSS = _GLOBAL_QSS_TEMPLATE.format(**asdict(theme))
+    if QApplication.instance() is not None:
+        PDFViewerUI.apply_global_stylesheet()
+    return GLOBAL_QSS
+
+
 class PDFViewerUI:
     """UI component factory and styling for PDF viewer"""
     
+    # Released toolbar buttons keyed by (text, tooltip, fixed_width), reused on rebuild
+    _button_pool = {}
+    
+    @staticmethod
+    def apply_global_stylesheet():
+        """Install the application-wide stylesheet used by all factory widgets"""
+        QApplication.instance().setStyleSheet(GLOBAL_QSS)
+    
     @staticmethod
     def create_toolbar_container():
         """Create the main toolbar container"""
         toolbar_container = QWidget()
-        toolbar_container.setStyleSheet(
-            "background-color: #3c3c3c; border-bottom: 1px solid #4a4a4a;"
-        )
+        toolbar_container.setObjectName("toolbar")
         return toolbar_container
     
     @staticmethod
@@ -32,55 +154,45 @@ class PDFViewerUI:
     @staticmethod
     def create_button(text, tooltip, fixed_width=None):
         """Create a styled toolbar button"""
+        pooled = PDFViewerUI._button_pool.get((text, tooltip, fixed_width))
+        if pooled:
+            return pooled.pop()
         button = QPushButton(text)
         button.setToolTip(tooltip)
-        button.setStyleSheet("""
-            QPushButton {
-                background-color: #3c3c3c;
-                color: white;
-                border: 1px solid #4a4a4a;
-                border-radius: 6px;
-                padding: 8px;
-                font-size: 18px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #4a4a4a;
-                border: 1px solid #5a5a5a;
-            }
-            QPushButton:pressed {
-                background-color: #2a2a2a;
-            }
-        """)
-        if fixed_width:
-            button.setFixedSize(fixed_width, 40)
+        if fixed_width and fixed_width != 40:
+            # Height still comes from the stylesheet; only the width is custom
+            button.setObjectName("tbBtnWide")
+            button.setFixedWidth(fixed_width)
         else:
-            button.setFixedSize(40, 40)
+            button.setObjectName("tbBtn")
         return button
     
+    @staticmethod
+    def release_button(button, text, tooltip, fixed_width=None):
+        """Detach a toolbar button and keep it for reuse by create_button"""
+        try:
+            button.clicked.disconnect()
+        except TypeError:
+            pass  # No connections
+        button.setChecked(False)
+        button.setCheckable(False)
+        button.setParent(None)
+        PDFViewerUI._button_pool.setdefault((text, tooltip, fixed_width), []).append(button)
+    
     @staticmethod
     def create_page_input():
         """Create the page number input field"""
         page_input = QLineEdit("0")
         page_input.setFixedSize(50, 40)
         page_input.setAlignment(Qt.AlignCenter)
-        page_input.setStyleSheet("""
-            QLineEdit {
-                background-color: #5a5a5a;
-                color: white;
-                border: 1px solid #6a6a6a;
-                border-radius: 5px;
-                padding: 2px;
-                font-size: 16px;
-            }
-        """)
+        page_input.setObjectName("pageInput")
         return page_input
     
     @staticmethod
     def create_page_label():
         """Create the total pages label"""
         label = QLabel("of 0")
-        label.setStyleSheet("color: white; font-size: 16px;")
+        label.setObjectName("pageLabel")
         return label
     
     @staticmethod
@@ -88,8 +200,9 @@ class PDFViewerUI:
         """Create the main content display label"""
         label = QLabel("Please open a PDF file.")
         label.setAlignment(Qt.AlignCenter)
-        label.setStyleSheet("color: #aaaaaa; font-size: 24px;")
-        label.setWordWrap(True)
+        label.setObjectName("contentLabel")
+        # Only ever shows a short placeholder, so skip rich-text detection and wrapping
+        label.setTextFormat(Qt.PlainText)
         return label
     
     @staticmethod
@@ -97,7 +210,11 @@ class PDFViewerUI:
         """Create the main scroll area"""
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("background-color: #1e1e1e; border: none;")
+        scroll_area.setObjectName("mainScroll")
+        # The resizable content widget always covers the viewport, so skip its erase pass
+        viewport = scroll_area.viewport()
+        viewport.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        viewport.setAutoFillBackground(False)
         return scroll_area
     
     @staticmethod
@@ -117,18 +234,68 @@ class PDFViewerUI:
         return layout
 
 
+@dataclass
+class Toolbar:
+    """Toolbar buttons by role"""
+    
+    __slots__ = ('zoom_out', 'zoom_in', 'color_mode', 'prev_page', 'next_page', 'open_pdf')
+    
+    zoom_out: QPushButton
+    zoom_in: QPushButton
+    color_mode: QPushButton
+    prev_page: QPushButton
+    next_page: QPushButton
+    open_pdf: QPushButton
+
+
 class ToolbarBuilder:
     """Builder class for creating toolbar with buttons"""
     
-    def __init__(self, layout):
+    def __init__(self, layout, keys=Toolbar.__slots__):
         self.layout = layout
-        self.buttons = {}
+        # Each button key owns a list slot; unknown keys get a slot on first use
+        self._keys = list(keys)
+        self._index = {key: i for i, key in enumerate(self._keys)}
+        self._buttons = [None] * len(self._keys)
+        self._button_specs = [None] * len(self._keys)
+        self._updates_were_enabled = None
+    
+    def __enter__(self):
+        self.begin()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end()
+        return False
+    
+    def begin(self):
+        """Suspend toolbar repaints while a batch of widgets is added"""
+        container = self.layout.parentWidget()
+        if container is not None and self._updates_were_enabled is None:
+            self._updates_were_enabled = container.updatesEnabled()
+            container.setUpdatesEnabled(False)
+        return self
+    
+    def end(self):
+        """Resume toolbar repaints, updating once for the whole batch"""
+        container = self.layout.parentWidget()
+        if container is not None and self._updates_were_enabled is not None:
+            container.setUpdatesEnabled(self._updates_were_enabled)
+        self._updates_were_enabled = None
+        return self
     
     def add_button(self, key, text, tooltip, fixed_width=None):
         """Add a button to the toolbar"""
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._buttons.append(None)
+            self._button_specs.append(None)
         button = PDFViewerUI.create_button(text, tooltip, fixed_width)
         self.layout.addWidget(button)
-        self.buttons[key] = button
+        self._buttons[index] = button
+        self._button_specs[index] = (text, tooltip, fixed_width)
         return button
     
     def add_spacing(self, width):
@@ -148,8 +315,23 @@ class ToolbarBuilder:
     
     def get_button(self, key):
         """Get a button by key"""
-        return self.buttons.get(key)
+        index = self._index.get(key)
+        return None if index is None else self._buttons[index]
     
     def get_all_buttons(self):
-        """Get all buttons"""
-        return self.buttons
+        """Get all added buttons by key"""
+        return {key: button for key, button in zip(self._keys, self._buttons)
+                if button is not None}
+    
+    def build(self):
+        """Get the added buttons as a Toolbar"""
+        return Toolbar(**{key: self.get_button(key) for key in Toolbar.__slots__})
+    
+    def release(self):
+        """Remove all buttons from the toolbar and return them to the button pool"""
+        for button, spec in zip(self._buttons, self._button_specs):
+            if button is not None:
+                self.layout.removeWidget(button)
+                PDFViewerUI.release_button(button, *spec)
+        self._buttons = [None] * len(self._keys)
+        self._button_specs = [None] * len(self._keys)
@@ -1,73 +1,175 @@
 """
 PDF Content Widget Module
-Handles touch events and gestures for PDF viewing
+Handles pinch gestures and mouse wheel events for PDF viewing
 """
 
-from PyQt5.QtWidgets import QWidget
-from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QWidget, QPinchGesture
+from PyQt5.QtCore import Qt, QRect, QEvent, QTimer
+from PyQt5.QtGui import QPainter, QRegion, QTouchDevice
+
+
+# angleDelta units for one standard mouse wheel notch
+_WHEEL_STEP = 120
 
 
 class PDFContentWidget(QWidget):
     """Custom widget to handle pinch-to-zoom gestures and mouse wheel events"""
     
+    __slots__ = ('parent_viewer',
+                 '_zoom_in', '_zoom_out', '_zoom_in_by', '_zoom_out_by',
+                 '_scroll_up', '_scroll_down',
+                 'tiled_page', 'tiled_size',
+                 '_zoom_accum', '_zoom_timer',
+                 '_wheel_accum_y', '_scroll_accum_y', '_wheel_timer')
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_viewer = parent
-        self.setAttribute(Qt.WA_AcceptTouchEvents, True)
-        self.pinch_scale_factor = 1.0
-        self.last_pinch_scale = 1.0
+        # Every pixel is painted by the content label or by paintEvent, so skip the erase
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+        self.setAttribute(Qt.WA_NoSystemBackground, True)
+        if parent is not None:
+            # Bound once here so event handlers skip two attribute lookups per call
+            self._zoom_in = parent.zoom_in
+            self._zoom_out = parent.zoom_out
+            self._zoom_in_by = parent.zoom_in_by_factor
+            self._zoom_out_by = parent.zoom_out_by_factor
+            self._scroll_up = parent.scroll_up
+            self._scroll_down = parent.scroll_down
+        # Pinch recognition is done by Qt; only worth enabling when a touch device exists
+        if QTouchDevice.devices():
+            self.setAttribute(Qt.WA_AcceptTouchEvents, True)
+            self.grabGesture(Qt.PinchGesture)
+        
+        # Pinch zoom steps are accumulated and applied at most once per frame
+        self._zoom_accum = 1.0
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(16)
+        self._zoom_timer.timeout.connect(self._flush_zoom)
+        
+        # Wheel deltas are accumulated and turned into whole zoom/scroll steps per frame
+        self._wheel_accum_y = 0
+        self._scroll_accum_y = 0
+        self._wheel_timer = QTimer(self)
+        self._wheel_timer.setSingleShot(True)
+        self._wheel_timer.setInterval(16)
+        self._wheel_timer.timeout.connect(self._flush_wheel)
+        self.tiled_page = None
+        self.tiled_size = (0, 0)
+    
+    def set_tiled_page(self, page_num, width, height):
+        """Paint the given page from tiles instead of the content label"""
+        self.tiled_page = page_num
+        self.tiled_size = (width, height)
+        self.setMinimumSize(width, height)
+        self.update()
+    
+    def clear_tiled_page(self):
+        """Stop tile painting and hand display back to the content label"""
+        if self.tiled_page is not None:
+            self.tiled_page = None
+            self.tiled_size = (0, 0)
+            self.setMinimumSize(0, 0)
+            self.update()
+    
+    def paintEvent(self, event):
+        """Paint the page tiles that intersect the exposed region and fill the margins"""
+        if self.tiled_page is None:
+            return super().paintEvent(event)
+        
+        painter = QPainter(self)
+        uncovered = QRegion(event.rect())
+        page_width, page_height = self.tiled_size
+        origin_x = max(0, (self.width() - page_width) // 2)
+        origin_y = max(0, (self.height() - page_height) // 2)
+        exposed = event.rect().translated(-origin_x, -origin_y).intersected(
+            QRect(0, 0, page_width, page_height))
+        if not exposed.isEmpty():
+            pdf_core = self.parent_viewer.pdf_core
+            tile_px = pdf_core.TILE_SIZE
+            for tile_y in range(exposed.top() // tile_px, exposed.bottom() // tile_px + 1):
+                for tile_x in range(exposed.left() // tile_px, exposed.right() // tile_px + 1):
+                    tile = pdf_core.get_page_tile(self.tiled_page, tile_x, tile_y, tile_px)
+                    if tile is not None:
+                        x = origin_x + tile_x * tile_px
+                        y = origin_y + tile_y * tile_px
+                        painter.drawPixmap(x, y, tile)
+                        uncovered = uncovered.subtracted(
+                            QRegion(x, y, tile.width(), tile.height()))
+        
+        background = self.palette().color(self.backgroundRole())
+        for rect in uncovered.rects():
+            painter.fillRect(rect, background)
+        painter.end()
         
     def event(self, event):
-        """Handle touch events for pinch-to-zoom"""
-        if event.type() == event.TouchBegin or event.type() == event.TouchUpdate or event.type() == event.TouchEnd:
-            return self.handle_touch_event(event)
+        """Route gesture events to the pinch handler"""
+        if event.type() == QEvent.Gesture:
+            return self.gestureEvent(event)
         return super().event(event)
     
-    def handle_touch_event(self, event):
-        """Process touch events for pinch gestures"""
-        if len(event.touchPoints()) == 2:
-            # Handle pinch gesture
-            touch_point1 = event.touchPoints()[0]
-            touch_point2 = event.touchPoints()[1]
-            
-            # Calculate distance between touch points
-            current_distance = ((touch_point1.pos().x() - touch_point2.pos().x()) ** 2 + 
-                              (touch_point1.pos().y() - touch_point2.pos().y()) ** 2) ** 0.5
-            
-            if hasattr(self, 'initial_distance'):
-                scale_factor = current_distance / self.initial_distance
-                zoom_delta = scale_factor - self.last_pinch_scale
-                
-                if abs(zoom_delta) > 0.05:  # Threshold to prevent too sensitive zooming
-                    if zoom_delta > 0:
-                        self.parent_viewer.zoom_in_by_factor(1.1)
-                    else:
-                        self.parent_viewer.zoom_out_by_factor(1.1)
-                    self.last_pinch_scale = scale_factor
-            else:
-                self.initial_distance = current_distance
-                self.last_pinch_scale = 1.0
-            
-            if event.type() == event.TouchEnd:
-                delattr(self, 'initial_distance')
-                self.last_pinch_scale = 1.0
-            
-            return True
-        return super().event(event)
+    def gestureEvent(self, event):
+        """Zoom by the scale change reported by Qt's pinch recognizer"""
+        pinch = event.gesture(Qt.PinchGesture)
+        if pinch is None:
+            return False
+        if pinch.changeFlags() & QPinchGesture.ScaleFactorChanged:
+            factor = pinch.scaleFactor()
+            if factor > 0.0:
+                self._queue_zoom(factor)
+        if pinch.state() in (Qt.GestureFinished, Qt.GestureCanceled):
+            self._flush_zoom()
+        event.accept(pinch)
+        return True
+    
+    def _queue_zoom(self, factor):
+        """Accumulate a pinch zoom step until the next flush"""
+        self._zoom_accum *= factor
+        if not self._zoom_timer.isActive():
+            self._zoom_timer.start()
+    
+    def _flush_zoom(self):
+        """Apply the accumulated pinch zoom in a single call"""
+        self._zoom_timer.stop()
+        factor = self._zoom_accum
+        self._zoom_accum = 1.0
+        if factor > 1.0:
+            self._zoom_in_by(factor)
+        elif factor < 1.0:
+            self._zoom_out_by(1 / factor)
     
     def wheelEvent(self, event):
         """Handle mouse wheel events for zoom and scroll"""
+        event.accept()
+        dy = event.angleDelta().y()
+        if not dy:
+            return  # Horizontal-only movement neither zooms nor scrolls
+        
         # Handle mouse wheel zoom with Ctrl key
         if event.modifiers() & Qt.ControlModifier:
-            if event.angleDelta().y() > 0:
-                self.parent_viewer.zoom_in()
-            else:
-                self.parent_viewer.zoom_out()
-            event.accept()
+            self._wheel_accum_y += dy
         else:
             # Handle continuous page scrolling
-            if event.angleDelta().y() > 0:
-                self.parent_viewer.scroll_up()
+            self._scroll_accum_y += dy
+        if not self._wheel_timer.isActive():
+            self._wheel_timer.start()
+    
+    def _flush_wheel(self):
+        """Apply one zoom or scroll step per full wheel notch accumulated"""
+        # int() truncates toward zero so small reverse deltas never fire a step
+        zoom_steps = int(self._wheel_accum_y / _WHEEL_STEP)
+        self._wheel_accum_y -= zoom_steps * _WHEEL_STEP
+        scroll_steps = int(self._scroll_accum_y / _WHEEL_STEP)
+        self._scroll_accum_y -= scroll_steps * _WHEEL_STEP
+        
+        for _ in range(abs(zoom_steps)):
+            if zoom_steps > 0:
+                self._zoom_in()
             else:
-                self.parent_viewer.scroll_down()
-            event.accept()
+                self._zoom_out()
+        # Steps left over after a page change are dropped, not applied to the old page
+        scroll = self._scroll_up if scroll_steps > 0 else self._scroll_down
+        for _ in range(abs(scroll_steps)):
+            if scroll():
+                break